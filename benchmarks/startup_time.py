@@ -0,0 +1,80 @@
+"""
+Measure cold-start import cost of the CLI using python -X importtime
+
+Usage: python benchmarks/startup_time.py [--top 15] [--repeat 5]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+REPO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Dependencies that should only be imported by the stage that uses them
+HEAVY_MODULES = ('bs4', 'slack_sdk', 'email_validator', 'schedule')
+
+
+def import_times(module: str) -> list:
+    """Return (cumulative_us, self_us, name) for each module imported by `import module`"""
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+                          cwd=REPO_DIR, capture_output=True, text=True)
+    if proc.returncode != 0:
+        sys.exit(f"import {module} failed:\n{proc.stderr.splitlines()[-1]}")
+
+    entries = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        entries.append((int(cumulative_us), int(self_us), name[1:].rstrip()))
+    return entries
+
+
+def module_tree(entries: list, module: str) -> tuple:
+    """
+    Return the module's cumulative time and the entries it imported
+
+    -X importtime prints a module's imports on the lines just before its own,
+    indented below it, so this excludes interpreter start-up such as site.
+    """
+    index = next(i for i, (_, _, name) in enumerate(entries) if name == module)
+    start = index
+    while start > 0 and entries[start - 1][2].startswith(' '):
+        start -= 1
+    return entries[index][0], entries[start:index]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--module', default='main')
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    entries = import_times(args.module)
+    total_us, nested = module_tree(entries, args.module)
+
+    # Direct imports of the module are nested one level (two spaces) below it
+    direct = [entry for entry in nested if not entry[2].startswith('   ')]
+
+    print(f"import {args.module}: {total_us / 1000:.1f} ms cumulative across {len(nested) + 1} modules\n")
+    print(f"{'cumulative ms':>14}  module")
+    for cumulative, _, name in sorted(direct, reverse=True)[:args.top]:
+        print(f"{cumulative / 1000:>14.1f}  {name.strip()}")
+
+    loaded = {name.strip() for _, _, name in entries}
+    eager = [module for module in HEAVY_MODULES if module in loaded]
+    print(f"\nHeavy modules imported at start-up: {', '.join(eager) if eager else 'none'}")
+
+    # Wall-clock time for the interpreter to start and parse CLI arguments
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, 'main.py', '--help'], cwd=REPO_DIR, capture_output=True, check=True)
+        timings.append(time.perf_counter() - start)
+    print(f"python main.py --help: best {min(timings) * 1000:.1f} ms of {args.repeat}")
+
+
+if __name__ == '__main__':
+    main()
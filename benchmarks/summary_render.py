@@ -0,0 +1,67 @@
+"""
+Benchmark summary rendering on a large IP inventory
+
+Usage: python benchmarks/summary_render.py [--ips 10000] [--pools 20] [--listed 0.02]
+"""
+import argparse
+import ipaddress
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from summary_renderer import SummaryRenderer, SLACK_MAX_CHARS, EMAIL_MAX_CHARS
+
+
+def build_inventory(ip_count: int, pool_count: int, listed_ratio: float):
+    """Build fake check results for ip_count IPs spread over pool_count pools"""
+    rng = random.Random(42)
+    base = int(ipaddress.ip_address('10.0.0.0'))
+    results = []
+    for i in range(ip_count):
+        # Leave occasional gaps so clean IPs collapse into several ranges
+        ip = str(ipaddress.ip_address(base + i + i // 250))
+        blacklists = []
+        if rng.random() < listed_ratio:
+            blacklists = [{'name': f"List{n}", 'removal_url': f"https://mxtoolbox.com/blacklists.aspx#List{n}"}
+                          for n in range(rng.randint(1, 3))]
+        results.append({
+            'ip': ip,
+            'pool': f"pool-{i * pool_count // ip_count}",
+            'listed_count': len(blacklists),
+            'timeout_count': 0,
+            'blacklists': blacklists,
+        })
+    new_listings = {(r['ip'], b['name']) for r in results[::2] for b in r['blacklists'][1:]}
+    return results, new_listings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--ips', type=int, default=10000)
+    parser.add_argument('--pools', type=int, default=20)
+    parser.add_argument('--listed', type=float, default=0.02)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    results, new_listings = build_inventory(args.ips, args.pools, args.listed)
+    last_check_time = '2024-01-01T00:00:00'
+
+    for style, max_chars in (('slack', SLACK_MAX_CHARS), ('email', EMAIL_MAX_CHARS)):
+        renderer = SummaryRenderer(style, max_chars)
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            chunks = renderer.render(results, new_listings, last_check_time)
+            timings.append(time.perf_counter() - start)
+
+        assert all(len(chunk) <= max_chars for chunk in chunks)
+        print(f"{style:>5}: {args.ips} IPs -> {len(chunks)} chunks, "
+              f"{sum(len(c) for c in chunks)} chars, largest {max(len(c) for c in chunks)}/{max_chars}, "
+              f"best {min(timings) * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,18 @@
 import sqlite3
-from typing import Dict, List, Any
-from datetime import datetime
+from typing import Dict, List, Any, Optional, Set, Tuple
+from datetime import datetime, timedelta
+from config import load_config
+
+# Listing transitions recorded in listing_events
+EVENT_LISTED = 'listed'
+EVENT_DELISTED = 'delisted'
+EVENT_STILL_LISTED = 'still_listed'
 
 class BlacklistStore:
     def __init__(self, logger):
         self.logger = logger
+        config = load_config()
+        self.still_listed_reminder_days = config['notifications'].get('still_listed_reminder_days', 0)
         self.conn = sqlite3.connect('blacklist_history.db')
         self.create_tables()
 
@@ -29,19 +37,75 @@ class BlacklistStore:
                     FOREIGN KEY (run_id) REFERENCES check_runs(id)
                 )
             ''')
+            # Databases created before pools were tracked lack these columns
+            cursor.execute('PRAGMA table_info(blacklist_results)')
+            columns = {row[1] for row in cursor.fetchall()}
+            if 'ip_pool' not in columns:
+                cursor.execute("ALTER TABLE blacklist_results ADD COLUMN ip_pool TEXT NOT NULL DEFAULT 'default'")
+            if 'hostname' not in columns:
+                cursor.execute('ALTER TABLE blacklist_results ADD COLUMN hostname TEXT')
+
+            # Current listings, used to detect transitions between runs
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'listing_state'")
+            seed_listing_state = cursor.fetchone() is None
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS listing_state (
+                    ip TEXT NOT NULL,
+                    blacklist_name TEXT NOT NULL,
+                    ip_pool TEXT NOT NULL DEFAULT 'default',
+                    removal_url TEXT,
+                    listed_since TEXT NOT NULL,
+                    last_event_at TEXT NOT NULL,
+                    PRIMARY KEY (ip, blacklist_name)
+                )
+            ''')
+            if seed_listing_state:
+                # Start from the latest run's listings so upgrading does not
+                # report every existing listing as new; reminders count from now
+                cursor.execute('''
+                    INSERT OR IGNORE INTO listing_state
+                    (ip, blacklist_name, ip_pool, removal_url, listed_since, last_event_at)
+                    SELECT r.ip, r.blacklist_name, r.ip_pool, r.removal_url, c.run_timestamp, ?
+                    FROM blacklist_results r
+                    JOIN check_runs c ON c.id = r.run_id
+                    WHERE r.run_id = (SELECT MAX(id) FROM check_runs)
+                      AND r.blacklist_name IS NOT NULL
+                ''', (datetime.now().isoformat(),))
+            # Ordered, append-only stream of listing transitions
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS listing_events (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    run_id INTEGER,
+                    event_type TEXT NOT NULL,
+                    ip TEXT NOT NULL,
+                    ip_pool TEXT NOT NULL DEFAULT 'default',
+                    blacklist_name TEXT NOT NULL,
+                    removal_url TEXT,
+                    listed_since TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    FOREIGN KEY (run_id) REFERENCES check_runs(id)
+                )
+            ''')
+            # Last event delivered to each notifier
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS notification_cursors (
+                    consumer TEXT PRIMARY KEY,
+                    last_event_id INTEGER NOT NULL
+                )
+            ''')
             self.conn.commit()
         except sqlite3.Error as e:
             self.logger.error(f"Failed to create tables: {str(e)}")
             raise
 
     def store_results(self, results: List[Dict[str, Any]]) -> int:
-        """Store the results of a check run"""
+        """Store the results of a check run and record any listing transitions"""
         try:
             cursor = self.conn.cursor()
+            now = datetime.now().isoformat()
 
             # Create new run record
-            cursor.execute('INSERT INTO check_runs (run_timestamp) VALUES (?)',
-                          (datetime.now().isoformat(),))
+            cursor.execute('INSERT INTO check_runs (run_timestamp) VALUES (?)', (now,))
             run_id = cursor.lastrowid
             if run_id is None:
                 raise ValueError("Failed to get last insert ID")
@@ -58,46 +122,173 @@ class BlacklistStore:
                         VALUES (?, ?, ?, ?, ?, ?)
                     ''', (run_id, ip, ip_pool, hostname, blacklist['name'], blacklist['removal_url']))
 
+            self._record_events(cursor, run_id, results, now)
+
             self.conn.commit()
             return run_id
         except sqlite3.Error as e:
             self.logger.error(f"Failed to store results: {str(e)}")
             raise
 
-    def get_previous_results(self) -> Dict[str, List[str]]:
-        """Get results from the previous run"""
+    def _record_events(self, cursor: sqlite3.Cursor, run_id: int,
+                       results: List[Dict[str, Any]], now: str) -> None:
+        """Compare results with the current listings and append transition events"""
+        # Only listings are tracked, so this is bounded by active listings, not inventory
+        cursor.execute('SELECT ip, blacklist_name, removal_url, listed_since, last_event_at FROM listing_state')
+        state: Dict[str, Dict[str, Tuple[str, str, str]]] = {}
+        for ip, blacklist_name, removal_url, listed_since, last_event_at in cursor.fetchall():
+            state.setdefault(ip, {})[blacklist_name] = (removal_url, listed_since, last_event_at)
+
+        reminder_cutoff = None
+        if self.still_listed_reminder_days:
+            reminder_cutoff = (datetime.fromisoformat(now) -
+                               timedelta(days=self.still_listed_reminder_days)).isoformat()
+
+        def add_event(event_type: str, ip: str, ip_pool: str, name: str,
+                      removal_url: str, listed_since: str) -> None:
+            cursor.execute('''
+                INSERT INTO listing_events
+                (run_id, event_type, ip, ip_pool, blacklist_name, removal_url, listed_since, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (run_id, event_type, ip, ip_pool, name, removal_url, listed_since, now))
+
+        for result in results:
+            ip = result['ip']
+            ip_pool = result.get('pool', 'default')
+            previous = state.get(ip, {})
+            current = {b['name']: b['removal_url'] for b in result.get('blacklists', [])}
+
+            for name, removal_url in current.items():
+                if name not in previous:
+                    add_event(EVENT_LISTED, ip, ip_pool, name, removal_url, now)
+                    cursor.execute('''
+                        INSERT INTO listing_state
+                        (ip, blacklist_name, ip_pool, removal_url, listed_since, last_event_at)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                    ''', (ip, name, ip_pool, removal_url, now, now))
+                elif reminder_cutoff and previous[name][2] <= reminder_cutoff:
+                    add_event(EVENT_STILL_LISTED, ip, ip_pool, name, removal_url, previous[name][1])
+                    cursor.execute('''
+                        UPDATE listing_state SET last_event_at = ?
+                        WHERE ip = ? AND blacklist_name = ?
+                    ''', (now, ip, name))
+
+            # A timed-out blacklist looks the same as a clean one, so only
+            # report delistings from checks that completed without timeouts
+            if result.get('timeout_count', 0) > 0:
+                continue
+
+            for name, (removal_url, listed_since, _) in previous.items():
+                if name not in current:
+                    add_event(EVENT_DELISTED, ip, ip_pool, name, removal_url, listed_since)
+                    cursor.execute('DELETE FROM listing_state WHERE ip = ? AND blacklist_name = ?',
+                                   (ip, name))
+
+    def get_events(self, after_id: int = 0) -> List[Dict[str, Any]]:
+        """Get listing events newer than after_id, oldest first"""
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute('''
+                SELECT id, run_id, event_type, ip, ip_pool, blacklist_name,
+                       removal_url, listed_since, created_at
+                FROM listing_events
+                WHERE id > ?
+                ORDER BY id
+            ''', (after_id,))
+
+            events = []
+            for row in cursor.fetchall():
+                event_id, run_id, event_type, ip, ip_pool, name, removal_url, listed_since, created_at = row
+                events.append({
+                    'id': event_id,
+                    'run_id': run_id,
+                    'type': event_type,
+                    'ip': ip,
+                    'pool': ip_pool,
+                    'blacklist': name,
+                    'removal_url': removal_url,
+                    'listed_since': listed_since,
+                    'created_at': created_at,
+                    'days_listed': (datetime.fromisoformat(created_at) -
+                                    datetime.fromisoformat(listed_since)).days
+                })
+            return events
+        except sqlite3.Error as e:
+            self.logger.error(f"Failed to get listing events: {str(e)}")
+            raise
+
+    def get_new_listings(self, run_id: Optional[int]) -> Set[Tuple[str, str]]:
+        """Get the (ip, blacklist) pairs that became listed in the given run"""
+        if run_id is None:
+            return set()
+
         try:
             cursor = self.conn.cursor()
+            cursor.execute('''
+                SELECT ip, blacklist_name
+                FROM listing_events
+                WHERE event_type = ? AND run_id = ?
+            ''', (EVENT_LISTED, run_id))
+            return set(cursor.fetchall())
+        except sqlite3.Error as e:
+            self.logger.error(f"Failed to get new listings: {str(e)}")
+            return set()
 
-            # Get the last run ID
-            cursor.execute('SELECT id FROM check_runs ORDER BY run_timestamp DESC LIMIT 1')
-            result = cursor.fetchone()
+    def register_consumer(self, consumer: str) -> None:
+        """
+        Start a cursor for a consumer that has none yet at the latest event
+
+        New consumers only receive events recorded after they are registered,
+        not the full history.
+        """
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute('''
+                INSERT OR IGNORE INTO notification_cursors (consumer, last_event_id)
+                SELECT ?, COALESCE(MAX(id), 0) FROM listing_events
+            ''', (consumer,))
+            self.conn.commit()
+        except sqlite3.Error as e:
+            self.logger.error(f"Failed to register notification consumer {consumer}: {str(e)}")
+            raise
 
-            if not result:
-                return {}
+    def get_cursor(self, consumer: str) -> int:
+        """Get the id of the last event delivered to a consumer"""
+        try:
+            self.register_consumer(consumer)
+            cursor = self.conn.cursor()
+            cursor.execute('SELECT last_event_id FROM notification_cursors WHERE consumer = ?', (consumer,))
+            return cursor.fetchone()[0]
+        except sqlite3.Error as e:
+            self.logger.error(f"Failed to get notification cursor for {consumer}: {str(e)}")
+            raise
 
-            last_run_id = result[0]
+    def skip_to_latest(self, consumer: str) -> None:
+        """Move a consumer's cursor past every recorded event without delivering them"""
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute('''
+                INSERT INTO notification_cursors (consumer, last_event_id)
+                SELECT ?, COALESCE(MAX(id), 0) FROM listing_events WHERE true
+                ON CONFLICT(consumer) DO UPDATE SET last_event_id = excluded.last_event_id
+            ''', (consumer,))
+            self.conn.commit()
+        except sqlite3.Error as e:
+            self.logger.error(f"Failed to skip notification cursor for {consumer}: {str(e)}")
+            raise
 
-            # Get blacklisted IPs from the last run with pool information
+    def set_cursor(self, consumer: str, event_id: int) -> None:
+        """Record that a consumer has delivered every event up to event_id"""
+        try:
+            cursor = self.conn.cursor()
             cursor.execute('''
-                SELECT DISTINCT ip, ip_pool, blacklist_name
-                FROM blacklist_results
-                WHERE run_id = ?
-            ''', (last_run_id,))
-
-            results = {}
-            for ip, pool, blacklist in cursor.fetchall():
-                if ip not in results:
-                    results[ip] = {
-                        'pool': pool,
-                        'blacklists': []
-                    }
-                results[ip]['blacklists'].append(blacklist)
-
-            return results
+                INSERT INTO notification_cursors (consumer, last_event_id) VALUES (?, ?)
+                ON CONFLICT(consumer) DO UPDATE SET last_event_id = excluded.last_event_id
+            ''', (consumer, event_id))
+            self.conn.commit()
         except sqlite3.Error as e:
-            self.logger.error(f"Failed to get previous results: {str(e)}")
-            return {}
+            self.logger.error(f"Failed to set notification cursor for {consumer}: {str(e)}")
+            raise
 
     def get_last_check_time(self) -> str:
         """Get the timestamp of the last check"""
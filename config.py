@@ -0,0 +1,11 @@
+import yaml
+from functools import lru_cache
+from typing import Dict, Any
+
+@lru_cache(maxsize=None)
+def load_config() -> Dict[str, Any]:
+    """
+    Load config.yaml once per process and return the parsed settings
+    """
+    with open('config.yaml', 'r') as f:
+        return yaml.safe_load(f)
@@ -1,19 +1,18 @@
 import os
-import yaml
+from config import load_config
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from email_validator import validate_email, EmailNotValidError
+from summary_renderer import SummaryRenderer, EMAIL_MAX_CHARS
 
 class EmailNotifier:
     def __init__(self, logger):
         self.logger = logger
 
         # Load config
-        with open('config.yaml', 'r') as f:
-            config = yaml.safe_load(f)
+        config = load_config()
 
         self.config = config['notifications']['email']
         self.enabled = self.config['enabled']
@@ -40,6 +39,7 @@ class EmailNotifier:
 
         # Store results for summary
         self.current_run_results = []
+        self.renderer = SummaryRenderer('email', EMAIL_MAX_CHARS)
 
     def _validate_emails(self) -> None:
         """Validate all email addresses in configuration"""
@@ -84,8 +84,9 @@ class EmailNotifier:
             pool = check_result.get('pool', 'default')
             self.logger.info(f"Processing email notification for IP {ip} (Pool: {pool})")
 
-            # Only send if blacklisted or notify_on_clean is true
-            if check_result['listed_count'] > 0 or self.notify_on_clean:
+            # Listings are reported once per transition by send_events; clean
+            # results are only sent when notify_on_clean is true
+            if check_result['listed_count'] == 0 and self.notify_on_clean:
                 message = self.format_message(check_result)
                 subject = f"{self.subject_prefix} Blacklist Alert - IP {ip} ({pool})"
 
@@ -96,80 +97,50 @@ class EmailNotifier:
             self.logger.error(f"Error in send_notification for IP {ip}: {str(e)}")
             raise
 
-    def send_summary(self, store) -> None:
+    def send_events(self, store) -> None:
+        """Email listing changes not yet delivered, advancing the stored cursor"""
+        if not self.enabled:
+            return
+
+        try:
+            events = store.get_events(store.get_cursor('email'))
+            if not events:
+                self.logger.info("No new listing changes for email")
+                return
+
+            chunks = self.renderer.render_events(events)
+            for i, (body, last_event_id) in enumerate(chunks, 1):
+                subject = f"{self.subject_prefix} Blacklist Changes"
+                if len(chunks) > 1:
+                    subject += f" ({i}/{len(chunks)})"
+                self._send_email(subject, body)
+                store.set_cursor('email', last_event_id)
+
+            self.logger.info(f"Successfully sent {len(events)} listing changes by email")
+
+        except Exception as e:
+            self.logger.error(f"Failed to send listing changes email: {str(e)}")
+            raise
+
+    def send_summary(self, store, run_id: Optional[int]) -> None:
         """Send a summary email after all IPs have been checked"""
         if not self.enabled:
             return
 
         try:
-            # Group results by IP pool
-            clean_ips_by_pool = {}
-            problem_ips_by_pool = {}
-
-            # Process current results
-            for result in self.current_run_results:
-                ip_pool = result.get('pool', 'default')
-                if result['listed_count'] > 0:
-                    if ip_pool not in problem_ips_by_pool:
-                        problem_ips_by_pool[ip_pool] = []
-                    problem_ips_by_pool[ip_pool].append(result)
-                else:
-                    if ip_pool not in clean_ips_by_pool:
-                        clean_ips_by_pool[ip_pool] = []
-                    clean_ips_by_pool[ip_pool].append(result['ip'])
-
-            # Get previous results for comparison
-            previous_results = store.get_previous_results()
+            # Listings that are new in this run are tagged in the summary
+            new_listings = store.get_new_listings(run_id)
             last_check_time = store.get_last_check_time()
 
-            # Format summary message
-            summary = "SparkPost IP Blacklist Check Summary\n"
-            summary += "=" * 40 + "\n\n"
-
-            if last_check_time:
-                last_check = datetime.fromisoformat(last_check_time)
-                summary += f"Last check: {last_check.strftime('%Y-%m-%d %H:%M:%S UTC')}\n\n"
-
-            total_ips = sum(len(ips) for ips in clean_ips_by_pool.values()) + \
-                       sum(len(ips) for ips in problem_ips_by_pool.values())
-            summary += f"Total IPs Checked: {total_ips}\n\n"
-
-            # Clean IPs by pool
-            if clean_ips_by_pool:
-                summary += "Clean IPs:\n"
-                for pool, ips in sorted(clean_ips_by_pool.items()):
-                    if ips:
-                        summary += f"Pool: {pool} ({len(ips)} IPs)\n"
-                        summary += f"{', '.join(ips)}\n\n"
-
-            # Problem IPs by pool
-            if problem_ips_by_pool:
-                summary += "Problems Found:\n"
-                summary += "=" * 20 + "\n\n"
-                for pool, results in sorted(problem_ips_by_pool.items()):
-                    summary += f"Pool: {pool} ({len(results)} affected IPs)\n"
-                    for result in results:
-                        ip = result['ip']
-                        summary += f"• {ip}:"
-
-                        # Check if this is a new or existing problem
-                        if ip in previous_results:
-                            new_blacklists = [b['name'] for b in result['blacklists']
-                                          if b['name'] not in previous_results[ip]['blacklists']]
-                            if new_blacklists:
-                                summary += " [NEW] "
-                        else:
-                            summary += " [NEW IP] "
-
-                        for blacklist in result['blacklists']:
-                            summary += f"\n  - {blacklist['name']}: {blacklist['removal_url']}"
-                        summary += "\n\n"
-            else:
-                summary += "No blacklist issues found!\n"
-
-            # Send summary email
-            subject = f"{self.subject_prefix} Daily Summary Report"
-            self._send_email(subject, summary)
+            chunks = self.renderer.render(self.current_run_results, new_listings, last_check_time)
+
+            # Send summary email, split into numbered parts if it is very large
+            for i, chunk in enumerate(chunks, 1):
+                subject = f"{self.subject_prefix} Daily Summary Report"
+                if len(chunks) > 1:
+                    subject += f" ({i}/{len(chunks)})"
+                self._send_email(subject, chunk)
+
             self.logger.info("Successfully sent summary email notification")
 
             # Clear current run results
@@ -1,5 +1,5 @@
 import logging
-import yaml
+from config import load_config
 from typing import NoReturn
 import os
 
@@ -8,11 +8,13 @@ def setup_logger() -> logging.Logger:
     Configure and return a logger instance based on config settings
     """
     # Load config
-    with open('config.yaml', 'r') as f:
-        config = yaml.safe_load(f)
+    config = load_config()
 
-    # Create logger
+    # Create logger, reusing it if it has already been configured
     logger = logging.getLogger('blacklist_monitor')
+    if logger.handlers:
+        return logger
+
     logger.setLevel(config['logging']['level'])
 
     # Create formatters and handlers
@@ -1,31 +1,59 @@
+import argparse
 import sys
-from typing import NoReturn
-import schedule
+from typing import NoReturn, Optional, List, Dict, Any
 import time
 
+from config import load_config
 from logger import setup_logger
 from sparkpost_client import SparkPostClient
 from mxtoolbox_client import MXToolboxClient
-from slack_notifier import SlackNotifier
-from email_notifier import EmailNotifier
 from blacklist_store import BlacklistStore
 
-def check_ips() -> None:
+# Exit codes for one-shot runs (argparse exits with 2 on usage errors)
+EXIT_CLEAN = 0
+EXIT_ERROR = 1
+EXIT_LISTED = 3
+EXIT_NO_IPS = 4
+
+def check_ips(mxtoolbox: Optional[MXToolboxClient] = None, pools: Optional[List[str]] = None,
+              ips: Optional[List[str]] = None, notify: bool = True, once: bool = False) -> int:
     """
     Main function to check IPs for blacklisting
+
+    Pass the daemon's long-lived MXToolboxClient so the sweep shares its rate
+    limiter, cache and in-flight checks with on-demand requests. pools and ips
+    restrict the run to matching sending IPs. Returns one of the EXIT_* codes.
+    Errors after the IPs were checked (storing results, setting up notifiers)
+    are logged, and only reported as EXIT_ERROR when once is true.
     """
     logger = setup_logger()
 
     try:
         # Initialize clients
         sparkpost = SparkPostClient(logger)
-        mxtoolbox = MXToolboxClient(logger)
-        slack = SlackNotifier(logger)
-        email = EmailNotifier(logger)
+        if mxtoolbox is None:
+            mxtoolbox = MXToolboxClient(logger)
         store = BlacklistStore(logger)
 
+        # Register notifiers before storing so they receive this run's listing changes
+        if notify:
+            store.register_consumer('slack')
+            if _email_enabled():
+                store.register_consumer('email')
+        else:
+            logger.info("Notifications disabled for this run")
+
         # Get all sending IPs from SparkPost
         sending_ips = sparkpost.get_sending_ips()
+        if pools:
+            sending_ips = [ip_info for ip_info in sending_ips if ip_info.get('pool', 'default') in pools]
+        if ips:
+            sending_ips = [ip_info for ip_info in sending_ips if ip_info['ip'] in ips]
+
+        if not sending_ips:
+            logger.warning("No sending IPs matched the requested pools/IPs")
+            return EXIT_NO_IPS
+
         check_results = []
 
         logger.info(f"Starting blacklist checks for {len(sending_ips)} IPs")
@@ -44,69 +72,124 @@ def check_ips() -> None:
             check_result['hostname'] = hostname
             check_results.append(check_result)
 
-            # Send notifications
-            try:
-                logger.info(f"Sending notifications for IP {ip} (Pool: {pool})")
-
-                # Send Slack notification
-                try:
-                    slack.send_notification(check_result)
-                except Exception as e:
-                    logger.error(f"Error sending Slack notification for IP {ip}: {str(e)}")
-
-                # Send email notification
-                try:
-                    email.send_notification(check_result)
-                except Exception as e:
-                    logger.error(f"Error sending email notification for IP {ip}: {str(e)}")
-
-            except Exception as e:
-                logger.error(f"Error sending notifications for IP {ip}: {str(e)}")
-
         # Store results for historical tracking
+        run_id = None
         try:
-            store.store_results(check_results)
+            run_id = store.store_results(check_results)
             logger.info("Successfully stored check results in database")
         except Exception as e:
             logger.error(f"Error storing results in database: {str(e)}")
 
-        # Send summary notifications
+        notified = True
         try:
-            logger.info("Sending summary notifications")
-
-            # Send Slack summary
-            try:
-                slack.send_summary(store)
-                logger.info("Successfully sent Slack summary notification")
-            except Exception as e:
-                logger.error(f"Error sending Slack summary notification: {str(e)}")
-
-            # Send email summary
-            try:
-                email.send_summary(store)
-                logger.info("Successfully sent email summary notification")
-            except Exception as e:
-                logger.error(f"Error sending email summary notification: {str(e)}")
+            # A disabled email channel should not receive a backlog once re-enabled
+            if not _email_enabled():
+                store.skip_to_latest('email')
 
+            if notify:
+                send_notifications(logger, store, run_id, check_results)
         except Exception as e:
-            logger.error(f"Error sending summary notifications: {str(e)}")
+            notified = False
+            logger.error(f"Error sending notifications: {str(e)}")
+
+        # The daemon keeps running through storage and notifier setup errors;
+        # one-shot runs report them so the job is marked as failed
+        if once and (run_id is None or not notified):
+            return EXIT_ERROR
+        if any(result['listed_count'] > 0 for result in check_results):
+            return EXIT_LISTED
+        return EXIT_CLEAN
 
     except Exception as e:
         logger.error(f"Error in blacklist monitoring: {str(e)}")
-        sys.exit(1)
+        return EXIT_ERROR
 
-def main() -> None:
+def _email_enabled() -> bool:
     """
-    Entry point for the script
+    Whether email notifications are enabled and have recipients to send to
+    """
+    email_config = load_config()['notifications']['email']
+    return bool(email_config['enabled'] and email_config['recipients'])
+
+def send_notifications(logger, store: BlacklistStore, run_id: Optional[int],
+                       check_results: List[Dict[str, Any]]) -> None:
+    """
+    Send listing changes, clean-IP notices and the summary to Slack and email
+
+    A notifier is only set up (importing slack_sdk or email_validator and, for
+    Slack, checking the connection) when its channel has something to send.
+    """
+    config = load_config()['notifications']
+    summary_enabled = config.get('summary_enabled', False)
+    has_clean = any(result['listed_count'] == 0 for result in check_results)
+
+    def has_work(consumer: str, notify_on_clean: bool) -> bool:
+        return (summary_enabled or (notify_on_clean and has_clean) or
+                bool(store.get_events(store.get_cursor(consumer))))
+
+    if has_work('slack', config['slack_notify_on_clean']):
+        from slack_notifier import SlackNotifier
+        _notify_channel(logger, 'Slack', SlackNotifier(logger), store, run_id, check_results, summary_enabled)
+    else:
+        logger.info("Nothing to send to Slack")
+
+    if _email_enabled() and has_work('email', config['email']['notify_on_clean']):
+        from email_notifier import EmailNotifier
+        _notify_channel(logger, 'email', EmailNotifier(logger), store, run_id, check_results, summary_enabled)
+    elif _email_enabled():
+        logger.info("Nothing to send by email")
+
+def _notify_channel(logger, channel: str, notifier, store: BlacklistStore, run_id: Optional[int],
+                    check_results: List[Dict[str, Any]], summary_enabled: bool) -> None:
+    """
+    Send one channel's notifications, logging failures so other channels still run
+    """
+    for check_result in check_results:
+        try:
+            notifier.send_notification(check_result)
+        except Exception as e:
+            logger.error(f"Error sending {channel} notification for IP {check_result['ip']}: {str(e)}")
+
+    # Send listing changes recorded since this notifier's last delivery
+    try:
+        notifier.send_events(store)
+    except Exception as e:
+        logger.error(f"Error sending {channel} listing changes: {str(e)}")
+
+    # The full summary repeats every listing, so it is only sent when enabled
+    if summary_enabled:
+        try:
+            notifier.send_summary(store, run_id)
+            logger.info(f"Successfully sent {channel} summary notification")
+        except Exception as e:
+            logger.error(f"Error sending {channel} summary notification: {str(e)}")
+
+def run_scheduled_check(mxtoolbox: MXToolboxClient) -> None:
     """
+    Run a daemon sweep, stopping the daemon if the IPs could not be checked
+    """
+    if check_ips(mxtoolbox) == EXIT_ERROR:
+        sys.exit(EXIT_ERROR)
+
+def run_daemon() -> NoReturn:
+    """
+    Run an initial check, then keep checking daily and serving on-demand checks
+    """
+    import schedule
+    from trigger_server import TriggerServer
+
     logger = setup_logger()
     logger.info("Starting SparkPost IP Blacklist Monitor")
 
+    # Shared by scheduled sweeps and on-demand checks
+    mxtoolbox = MXToolboxClient(logger)
+    TriggerServer(logger, mxtoolbox, SparkPostClient(logger)).start()
+
     # Run immediately on start
-    check_ips()
+    run_scheduled_check(mxtoolbox)
 
     # Schedule daily execution
-    schedule.every().day.at("00:00").do(check_ips)
+    schedule.every().day.at("00:00").do(run_scheduled_check, mxtoolbox)
     logger.info("Scheduled daily checks for 00:00 UTC")
 
     # Keep the script running
@@ -114,5 +197,42 @@ def main() -> None:
         schedule.run_pending()
         time.sleep(60)
 
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    Parse command line arguments
+    """
+    parser = argparse.ArgumentParser(description="SparkPost IP Blacklist Monitor")
+    subparsers = parser.add_subparsers(dest='command')
+
+    run_parser = subparsers.add_parser('run', help="Run the monitor (default when no command is given)")
+    run_parser.add_argument('--once', action='store_true',
+                            help="Check once and exit instead of running as a daemon")
+    run_parser.add_argument('--pool', action='append', dest='pools', metavar='POOL',
+                            help="Only check IPs in this pool (repeatable, requires --once)")
+    run_parser.add_argument('--ip', action='append', dest='ips', metavar='IP',
+                            help="Only check this IP (repeatable, requires --once)")
+    run_parser.add_argument('--no-notify', action='store_true',
+                            help="Skip Slack and email notifications (requires --once)")
+
+    args = parser.parse_args(argv)
+    if args.command == 'run' and not args.once and (args.pools or args.ips or args.no_notify):
+        run_parser.error("--pool, --ip and --no-notify require --once")
+    return args
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Entry point for the script
+
+    Exit codes for 'run --once': 0 all clean, 1 error (including failing to
+    store results), 2 usage error, 3 at least one IP listed, 4 no sending IPs
+    matched the filters.
+    """
+    args = parse_args(argv)
+
+    if args.command == 'run' and args.once:
+        sys.exit(check_ips(pools=args.pools, ips=args.ips, notify=not args.no_notify, once=True))
+
+    run_daemon()
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,30 +1,101 @@
 import requests
+import threading
 import time
-from typing import Dict, Any, List
-import yaml
-from bs4 import BeautifulSoup
+from concurrent.futures import Future
+from typing import Dict, Any, List, Optional, Tuple
+from config import load_config
 import re
 
 class MXToolboxClient:
     def __init__(self, logger):
-        with open('config.yaml', 'r') as f:
-            config = yaml.safe_load(f)
+        config = load_config()
 
         self.base_url = config['mxtoolbox']['base_url']
         self.check_interval = config['mxtoolbox']['check_interval']
+        self.cache_ttl = config['mxtoolbox'].get('cache_ttl', 0)
+        self.request_timeout = config['mxtoolbox'].get('request_timeout', 30)
         self.logger = logger
 
-    def check_ip_blacklist(self, ip: str) -> Dict[str, Any]:
+        # Shared between the scheduled sweep and on-demand checks
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self._cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._rate_lock = threading.Lock()
+        self._next_request_at = 0.0
+
+    def check_ip_blacklist(self, ip: str, max_age: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Check if an IP is blacklisted, coalescing concurrent checks of the same IP
+
+        Results younger than max_age seconds (default: the configured cache_ttl)
+        are served from the cache. If another thread is already fetching the IP,
+        this call waits for and returns that result instead of fetching again.
+        """
+        if max_age is None:
+            max_age = self.cache_ttl
+
+        with self._lock:
+            cached = self._cache.get(ip)
+            if cached and time.monotonic() - cached[0] < max_age:
+                self.logger.info(f"Using cached blacklist result for IP {ip}")
+                return self._copy_result(cached[1])
+
+            future = self._inflight.get(ip)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[ip] = future
+
+        if not leader:
+            self.logger.info(f"Check already in progress for IP {ip}, waiting for its result")
+            return self._copy_result(future.result())
+
+        try:
+            result = self._fetch_blacklist(ip)
+        except Exception as e:
+            with self._lock:
+                del self._inflight[ip]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            self._cache[ip] = (time.monotonic(), result)
+            del self._inflight[ip]
+        future.set_result(result)
+
+        return self._copy_result(result)
+
+    @staticmethod
+    def _copy_result(result: Dict[str, Any]) -> Dict[str, Any]:
+        """Return a copy callers can annotate without affecting other waiters"""
+        copy = dict(result)
+        copy['blacklists'] = list(result['blacklists'])
+        return copy
+
+    def _wait_for_rate_limit(self) -> None:
+        """Block until check_interval has passed since the previous upstream request"""
+        with self._rate_lock:
+            delay = self._next_request_at - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self._next_request_at = time.monotonic() + self.check_interval
+
+    def _fetch_blacklist(self, ip: str) -> Dict[str, Any]:
         """
         Check if an IP is blacklisted using MXToolbox
         """
         try:
+            # Respect rate limiting across all callers
+            self._wait_for_rate_limit()
+
             # Use the SuperTool endpoint
             url = f"https://mxtoolbox.com/SuperTool.aspx?action=mx%3a{ip}&run=toolpage"
-            response = requests.get(url)
+            # A timeout fails this check and every caller waiting on it
+            response = requests.get(url, timeout=self.request_timeout)
             response.raise_for_status()
 
-            # Parse the HTML response
+            # Parse the HTML response; bs4 is imported here to keep start-up fast
+            from bs4 import BeautifulSoup
             soup = BeautifulSoup(response.text, 'html.parser')
 
             # Find blacklist entries
@@ -61,11 +132,8 @@ class MXToolboxClient:
 
             self.logger.info(f"Checked IP {ip} against blacklists: {listed_count} listings, {timeout_count} timeouts")
 
-            # Respect rate limiting
-            time.sleep(self.check_interval)
-
             return result
 
         except requests.exceptions.RequestException as e:
             self.logger.error(f"Failed to check IP {ip}: {str(e)}")
-            raise
\ No newline at end of file
+            raise
@@ -1,10 +1,10 @@
 import os
-import yaml
+from config import load_config
 from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
-from datetime import datetime
-from typing import Dict, Any, List
-from collections import defaultdict
+from slack_sdk.http_retry.builtin_handlers import RateLimitErrorRetryHandler
+from typing import Dict, Any, List, Optional
+from summary_renderer import SummaryRenderer, SLACK_MAX_CHARS
 
 class SlackNotifier:
     def __init__(self, logger):
@@ -15,12 +15,15 @@ class SlackNotifier:
             raise ValueError("SLACK_BOT_TOKEN and SLACK_CHANNEL_ID environment variables must be set")
 
         self.client = WebClient(token=self.slack_token)
+        # Summaries and change digests can span several messages; wait out
+        # chat.postMessage rate limits instead of dropping the remainder
+        self.client.retry_handlers.append(RateLimitErrorRetryHandler(max_retry_count=5))
         self.logger = logger
 
-        with open('config.yaml', 'r') as f:
-            config = yaml.safe_load(f)
+        config = load_config()
         self.notify_on_clean = config['notifications']['slack_notify_on_clean']
         self.current_run_results = []
+        self.renderer = SummaryRenderer('slack', SLACK_MAX_CHARS)
 
         # Verify Slack connection on initialization
         try:
@@ -59,8 +62,9 @@ class SlackNotifier:
             pool = check_result.get('pool', 'default')
             self.logger.info(f"Processing notification for IP {ip} (Pool: {pool})")
 
-            # Only send if blacklisted or notify_on_clean is true
-            if check_result['listed_count'] > 0 or self.notify_on_clean:
+            # Listings are reported once per transition by send_events; clean
+            # results are only sent when notify_on_clean is true
+            if check_result['listed_count'] == 0 and self.notify_on_clean:
                 try:
                     message = self.format_message(check_result)
                     self.logger.info(f"Sending Slack message for IP {ip}: {message[:100]}...")
@@ -88,75 +92,49 @@ class SlackNotifier:
             self.logger.error(f"Error in send_notification: {str(e)}")
             raise
 
-    def send_summary(self, store) -> None:
+    def send_events(self, store) -> None:
+        """Send listing changes not yet delivered to Slack, advancing the stored cursor"""
+        try:
+            events = store.get_events(store.get_cursor('slack'))
+            if not events:
+                self.logger.info("No new listing changes for Slack")
+                return
+
+            for text, last_event_id in self.renderer.render_events(events):
+                self.client.chat_postMessage(
+                    channel=self.channel_id,
+                    text=text,
+                    unfurl_links=False
+                )
+                store.set_cursor('slack', last_event_id)
+
+            self.logger.info(f"Successfully sent {len(events)} listing changes to Slack")
+
+        except SlackApiError as e:
+            self.logger.error(f"Failed to send listing changes: {str(e)}")
+            if e.response['error'] == 'invalid_auth':
+                self.logger.error("Invalid Slack authentication. Please check your SLACK_BOT_TOKEN.")
+            elif e.response['error'] == 'channel_not_found':
+                self.logger.error("Invalid Slack channel. Please check your SLACK_CHANNEL_ID.")
+            raise
+
+    def send_summary(self, store, run_id: Optional[int]) -> None:
         """Send a summary message after all IPs have been checked"""
         try:
-            # Group results by IP pool
-            clean_ips_by_pool = defaultdict(list)
-            problem_ips_by_pool = defaultdict(list)
-
-            # Process current results
-            for result in self.current_run_results:
-                ip_pool = result.get('pool', 'default')
-                if result['listed_count'] > 0:
-                    problem_ips_by_pool[ip_pool].append(result)
-                else:
-                    clean_ips_by_pool[ip_pool].append(result['ip'])
-
-            # Get previous results for comparison
-            previous_results = store.get_previous_results()
+            # Listings that are new in this run are tagged in the summary
+            new_listings = store.get_new_listings(run_id)
             last_check_time = store.get_last_check_time()
 
-            # Format summary message
-            summary = "*SparkPost IP Blacklist Check Summary*\n"
-
-            if last_check_time:
-                last_check = datetime.fromisoformat(last_check_time)
-                summary += f"Last check: {last_check.strftime('%Y-%m-%d %H:%M:%S UTC')}\n\n"
-
-            total_ips = sum(len(ips) for ips in clean_ips_by_pool.values()) + \
-                       sum(len(ips) for ips in problem_ips_by_pool.values())
-            summary += f"*Total IPs Checked: {total_ips}*\n\n"
-
-            # Clean IPs by pool
-            if clean_ips_by_pool:
-                summary += "✅ *Clean IPs:*\n"
-                for pool, ips in sorted(clean_ips_by_pool.items()):
-                    if ips:
-                        summary += f"• *Pool: {pool}* ({len(ips)} IPs)\n"
-                        summary += f"  {', '.join(ips)}\n"
-                summary += "\n"
-
-            # Problem IPs by pool
-            if problem_ips_by_pool:
-                summary += "⚠️ *Problems Found:*\n"
-                for pool, results in sorted(problem_ips_by_pool.items()):
-                    summary += f"\n*Pool: {pool}* ({len(results)} affected IPs)\n"
-                    for result in results:
-                        ip = result['ip']
-                        summary += f"• {ip}:"
-
-                        # Check if this is a new or existing problem
-                        if ip in previous_results:
-                            new_blacklists = [b['name'] for b in result['blacklists']
-                                              if b['name'] not in previous_results[ip]['blacklists']]
-                            if new_blacklists:
-                                summary += " [NEW] "
-                        else:
-                            summary += " [NEW IP] "
-
-                        for blacklist in result['blacklists']:
-                            summary += f"\n  - {blacklist['name']}: {blacklist['removal_url']}"
-                        summary += "\n"
-            else:
-                summary += "✨ *No blacklist issues found!* 🎉"
-
-            # Send summary
-            self.client.chat_postMessage(
-                channel=self.channel_id,
-                text=summary,
-                unfurl_links=False
-            )
+            chunks = self.renderer.render(self.current_run_results, new_listings, last_check_time)
+
+            # Send summary, split across messages to stay within Slack's text limit
+            for chunk in chunks:
+                self.client.chat_postMessage(
+                    channel=self.channel_id,
+                    text=chunk,
+                    unfurl_links=False
+                )
+
             self.logger.info("Successfully sent summary notification to Slack")
 
             # Clear current run results
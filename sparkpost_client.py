@@ -1,12 +1,11 @@
 import requests
-import yaml
+from config import load_config
 from typing import List, Dict, Any
 import os
 
 class SparkPostClient:
     def __init__(self, logger):
-        with open('config.yaml', 'r') as f:
-            config = yaml.safe_load(f)
+        config = load_config()
 
         self.base_url = config['sparkpost']['base_url']
         self.api_key = os.environ.get('SPARKPOST_API_KEY')
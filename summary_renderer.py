@@ -0,0 +1,226 @@
+import ipaddress
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Any, Iterable, List, Set, Tuple
+
+# Slack truncates chat.postMessage text past 40,000 characters and recommends
+# staying under 4,000; email bodies are kept well below common size limits.
+SLACK_MAX_CHARS = 3500
+EMAIL_MAX_CHARS = 100000
+
+STYLES = {
+    'slack': {
+        'title': "*SparkPost IP Blacklist Check Summary*\n",
+        # Clean IPs are listed as ranges; pools with more ranges than this are cut short
+        'max_clean_ranges': 20,
+        'last_check': "Last check: {time}\n\n",
+        'total': "*Total IPs Checked: {total}*\n\n",
+        'clean_header': "✅ *Clean IPs:*\n",
+        'clean_pool': "• *Pool: {pool}* ({count} IPs)\n  {ranges}\n",
+        'clean_footer': "\n",
+        'problem_header': "⚠️ *Problems Found:*\n",
+        'problem_pool': "\n*Pool: {pool}* ({count} affected IPs)\n",
+        'problem_ip': "• {ip}:{tag}",
+        'blacklist': "\n  - {name}: {removal_url}",
+        'problem_footer': "\n",
+        'no_problems': "✨ *No blacklist issues found!* 🎉",
+        'events_title': "*SparkPost IP Blacklist Changes*\n",
+        'listed': "🚫 *Listed:* {ip} ({pool}) on {blacklist}: {removal_url}\n",
+        'delisted': "✅ *Delisted:* {ip} ({pool}) from {blacklist} after {days_listed} days\n",
+        'still_listed': "⏳ *Still listed:* {ip} ({pool}) on {blacklist} for {days_listed} days: {removal_url}\n",
+    },
+    'email': {
+        'title': "SparkPost IP Blacklist Check Summary\n" + "=" * 40 + "\n\n",
+        'max_clean_ranges': None,
+        'last_check': "Last check: {time}\n\n",
+        'total': "Total IPs Checked: {total}\n\n",
+        'clean_header': "Clean IPs:\n",
+        'clean_pool': "Pool: {pool} ({count} IPs)\n{ranges}\n\n",
+        'clean_footer': "",
+        'problem_header': "Problems Found:\n" + "=" * 20 + "\n\n",
+        'problem_pool': "Pool: {pool} ({count} affected IPs)\n",
+        'problem_ip': "• {ip}:{tag}",
+        'blacklist': "\n  - {name}: {removal_url}",
+        'problem_footer': "\n\n",
+        'no_problems': "No blacklist issues found!\n",
+        'events_title': "SparkPost IP Blacklist Changes\n" + "=" * 40 + "\n\n",
+        'listed': "LISTED: {ip} ({pool}) on {blacklist}: {removal_url}\n",
+        'delisted': "DELISTED: {ip} ({pool}) from {blacklist} after {days_listed} days\n",
+        'still_listed': "STILL LISTED: {ip} ({pool}) on {blacklist} for {days_listed} days: {removal_url}\n",
+    },
+}
+
+
+def collapse_ip_ranges(ips: Iterable[str]) -> List[str]:
+    """
+    Collapse IPs into sorted 'first-last' ranges of consecutive addresses
+
+    Strings that are not valid IP addresses are kept as-is after the ranges.
+    """
+    addresses = []
+    invalid = []
+    for ip in ips:
+        try:
+            addresses.append(ipaddress.ip_address(ip))
+        except ValueError:
+            invalid.append(ip)
+
+    addresses.sort(key=lambda address: (address.version, int(address)))
+
+    ranges = []
+    start = end = None
+    for address in addresses:
+        if end is not None and address.version == end.version and int(address) - int(end) <= 1:
+            end = address
+            continue
+        if start is not None:
+            ranges.append(str(start) if start == end else f"{start}-{end}")
+        start = end = address
+    if start is not None:
+        ranges.append(str(start) if start == end else f"{start}-{end}")
+
+    return ranges + invalid
+
+
+def chunk_blocks(blocks: Iterable[str], max_chars: int) -> List[str]:
+    """
+    Pack text blocks into as few chunks of at most max_chars as possible
+
+    Blocks are never split unless a single block exceeds max_chars, in which
+    case it is split on line boundaries (and long lines at max_chars).
+    """
+    chunks = []
+    current: List[str] = []
+    current_len = 0
+
+    def pieces(block: str) -> Iterable[str]:
+        if len(block) <= max_chars:
+            yield block
+            return
+        for line in block.splitlines(keepends=True):
+            for i in range(0, len(line), max_chars):
+                yield line[i:i + max_chars]
+
+    for block in blocks:
+        for piece in pieces(block):
+            if current_len + len(piece) > max_chars and current:
+                chunks.append(''.join(current))
+                current = []
+                current_len = 0
+            current.append(piece)
+            current_len += len(piece)
+
+    if current:
+        chunks.append(''.join(current))
+
+    return chunks
+
+
+class SummaryRenderer:
+    """Render the run summary for a notification channel in size-limited chunks"""
+
+    def __init__(self, style: str, max_chars: int):
+        self.templates = STYLES[style]
+        self.max_chars = max_chars
+
+    def render(self, results: List[Dict[str, Any]], new_listings: Set[Tuple[str, str]],
+               last_check_time: str) -> List[str]:
+        """Render the summary of a run, split into chunks of at most max_chars"""
+        return chunk_blocks(self.render_blocks(results, new_listings, last_check_time), self.max_chars)
+
+    def render_events(self, events: List[Dict[str, Any]]) -> List[Tuple[str, int]]:
+        """
+        Render listing events into chunks of at most max_chars
+
+        Returns (text, last_event_id) pairs so callers can advance their cursor
+        after each chunk is delivered.
+        """
+        t = self.templates
+        chunks = []
+        current = [t['events_title']]
+        current_len = len(t['events_title'])
+        last_id = 0
+
+        for event in events:
+            block = t[event['type']].format(**event)
+            if current_len + len(block) > self.max_chars and len(current) > 1:
+                chunks.append((''.join(current), last_id))
+                current = [t['events_title']]
+                current_len = len(t['events_title'])
+            current.append(block)
+            current_len += len(block)
+            last_id = event['id']
+
+        if len(current) > 1:
+            chunks.append((''.join(current), last_id))
+
+        return chunks
+
+    def render_blocks(self, results: List[Dict[str, Any]], new_listings: Set[Tuple[str, str]],
+                      last_check_time: str) -> List[str]:
+        """Render the summary as a list of blocks that should not be split across chunks"""
+        t = self.templates
+
+        # Group results by IP pool
+        clean_ips_by_pool = defaultdict(list)
+        problem_ips_by_pool = defaultdict(list)
+        for result in results:
+            ip_pool = result.get('pool', 'default')
+            if result['listed_count'] > 0:
+                problem_ips_by_pool[ip_pool].append(result)
+            else:
+                clean_ips_by_pool[ip_pool].append(result['ip'])
+
+        blocks = [t['title']]
+
+        try:
+            last_check = datetime.fromisoformat(last_check_time)
+            blocks.append(t['last_check'].format(time=last_check.strftime('%Y-%m-%d %H:%M:%S UTC')))
+        except (TypeError, ValueError):
+            pass
+
+        blocks.append(t['total'].format(total=len(results)))
+
+        # Clean IPs by pool, collapsed into ranges
+        if clean_ips_by_pool:
+            blocks.append(t['clean_header'])
+            for pool, ips in sorted(clean_ips_by_pool.items()):
+                ranges = collapse_ip_ranges(ips)
+                max_ranges = t['max_clean_ranges']
+                listed = ', '.join(ranges[:max_ranges])
+                if max_ranges is not None and len(ranges) > max_ranges:
+                    listed += f" and {len(ranges) - max_ranges} more ranges"
+                blocks.append(t['clean_pool'].format(pool=pool, count=len(ips), ranges=listed))
+            blocks.append(t['clean_footer'])
+
+        # Problem IPs by pool, one block per IP
+        if problem_ips_by_pool:
+            blocks.append(t['problem_header'])
+            for pool, pool_results in sorted(problem_ips_by_pool.items()):
+                blocks.append(t['problem_pool'].format(pool=pool, count=len(pool_results)))
+                for result in pool_results:
+                    blocks.append(self._render_problem(result, new_listings))
+        else:
+            blocks.append(t['no_problems'])
+
+        return blocks
+
+    def _render_problem(self, result: Dict[str, Any], new_listings: Set[Tuple[str, str]]) -> str:
+        t = self.templates
+        ip = result['ip']
+
+        # Check if this is a new or existing problem
+        new_count = sum((ip, b['name']) in new_listings for b in result['blacklists'])
+        if new_count and new_count == len(result['blacklists']):
+            tag = " [NEW IP] "
+        elif new_count:
+            tag = " [NEW] "
+        else:
+            tag = ""
+
+        parts = [t['problem_ip'].format(ip=ip, tag=tag)]
+        for blacklist in result['blacklists']:
+            parts.append(t['blacklist'].format(name=blacklist['name'], removal_url=blacklist['removal_url']))
+        parts.append(t['problem_footer'])
+
+        return ''.join(parts)
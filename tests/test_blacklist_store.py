@@ -0,0 +1,134 @@
+import logging
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+import blacklist_store
+from blacklist_store import BlacklistStore
+
+CONFIG = {'notifications': {'still_listed_reminder_days': 7}}
+
+
+@pytest.fixture
+def make_store(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(blacklist_store, 'load_config', lambda: CONFIG)
+    return lambda: BlacklistStore(logging.getLogger('test'))
+
+
+@pytest.fixture
+def store(make_store):
+    return make_store()
+
+
+def result(ip, blacklists, timeout_count=0):
+    return {
+        'ip': ip,
+        'pool': 'default',
+        'listed_count': len(blacklists),
+        'timeout_count': timeout_count,
+        'blacklists': [{'name': name, 'removal_url': f"https://mxtoolbox.com/blacklists.aspx#{name}"}
+                       for name in blacklists],
+    }
+
+
+def event_summary(events):
+    return [(event['type'], event['ip'], event['blacklist']) for event in events]
+
+
+def test_new_listings_are_recorded_once(store):
+    run_id = store.store_results([result('192.0.2.1', ['A', 'B']), result('192.0.2.2', [])])
+    assert event_summary(store.get_events()) == [
+        ('listed', '192.0.2.1', 'A'),
+        ('listed', '192.0.2.1', 'B'),
+    ]
+    assert store.get_new_listings(run_id) == {('192.0.2.1', 'A'), ('192.0.2.1', 'B')}
+
+    # Unchanged listings produce no further events
+    run_id = store.store_results([result('192.0.2.1', ['A', 'B']), result('192.0.2.2', [])])
+    assert len(store.get_events()) == 2
+    assert store.get_new_listings(run_id) == set()
+
+
+def test_delisting_is_recorded(store):
+    store.store_results([result('192.0.2.1', ['A', 'B'])])
+    store.store_results([result('192.0.2.1', ['A'])])
+
+    assert event_summary(store.get_events(2)) == [('delisted', '192.0.2.1', 'B')]
+
+
+def test_timeouts_do_not_count_as_delisting(store):
+    store.store_results([result('192.0.2.1', ['A', 'B'])])
+    store.store_results([result('192.0.2.1', ['A'], timeout_count=1)])
+    assert store.get_events(2) == []
+
+    store.store_results([result('192.0.2.1', ['A'])])
+    assert event_summary(store.get_events(2)) == [('delisted', '192.0.2.1', 'B')]
+
+
+def test_ips_missing_from_a_run_stay_listed(store):
+    store.store_results([result('192.0.2.1', ['A']), result('192.0.2.2', ['A'])])
+    store.store_results([result('192.0.2.2', ['A'])])
+
+    assert len(store.get_events()) == 2
+
+
+def test_still_listed_reminder_after_configured_days(store):
+    store.store_results([result('192.0.2.1', ['A'])])
+    eight_days_ago = (datetime.now() - timedelta(days=8)).isoformat()
+    store.conn.execute('UPDATE listing_state SET listed_since = ?, last_event_at = ?',
+                       (eight_days_ago, eight_days_ago))
+    store.conn.commit()
+
+    store.store_results([result('192.0.2.1', ['A'])])
+    store.store_results([result('192.0.2.1', ['A'])])
+
+    reminders = store.get_events(1)
+    assert event_summary(reminders) == [('still_listed', '192.0.2.1', 'A')]
+    assert reminders[0]['days_listed'] == 8
+
+
+def test_listing_state_is_seeded_from_existing_history(tmp_path, make_store):
+    conn = sqlite3.connect(tmp_path / 'blacklist_history.db')
+    conn.execute('CREATE TABLE check_runs (id INTEGER PRIMARY KEY AUTOINCREMENT, run_timestamp TEXT NOT NULL)')
+    # Schema from before pools were tracked, as in the committed database
+    conn.execute('CREATE TABLE blacklist_results (run_id INTEGER, ip TEXT NOT NULL, blacklist_name TEXT, removal_url TEXT)')
+    conn.execute("INSERT INTO check_runs (run_timestamp) VALUES ('2024-01-01T00:00:00')")
+    conn.execute("INSERT INTO check_runs (run_timestamp) VALUES ('2024-01-02T00:00:00')")
+    conn.execute("INSERT INTO blacklist_results VALUES (1, '192.0.2.9', 'Old', 'u')")
+    conn.execute("INSERT INTO blacklist_results VALUES (2, '192.0.2.1', 'A', 'u')")
+    conn.commit()
+    conn.close()
+
+    store = make_store()
+    store.store_results([result('192.0.2.1', ['A'])])
+    assert store.get_events() == []
+
+    store.store_results([result('192.0.2.1', [])])
+    assert event_summary(store.get_events()) == [('delisted', '192.0.2.1', 'A')]
+
+
+def test_new_consumer_starts_at_latest_event(store):
+    store.store_results([result('192.0.2.1', ['A'])])
+
+    assert store.get_cursor('email') == 1
+
+    store.store_results([result('192.0.2.1', ['A', 'B'])])
+    assert event_summary(store.get_events(store.get_cursor('email'))) == [('listed', '192.0.2.1', 'B')]
+
+
+def test_cursor_updates(store):
+    store.register_consumer('slack')
+    store.store_results([result('192.0.2.1', ['A', 'B'])])
+    assert store.get_cursor('slack') == 0
+
+    store.set_cursor('slack', 1)
+    assert store.get_cursor('slack') == 1
+
+    store.skip_to_latest('slack')
+    assert store.get_cursor('slack') == 2
+
+
+def test_new_listings_without_run(store):
+    assert store.get_new_listings(None) == set()
@@ -0,0 +1,200 @@
+import logging
+import os
+import sys
+import types
+
+import pytest
+import yaml
+
+import main
+from config import load_config
+from mxtoolbox_client import MXToolboxClient
+from sparkpost_client import SparkPostClient
+
+REPO_DIR = os.path.join(os.path.dirname(__file__), '..')
+
+SENDING_IPS = [
+    {'ip': '192.0.2.1', 'pool': 'a', 'hostname': 'mta1.example.com'},
+    {'ip': '192.0.2.2', 'pool': 'a', 'hostname': 'mta2.example.com'},
+    {'ip': '192.0.2.3', 'pool': 'b', 'hostname': 'mta3.example.com'},
+]
+
+
+class FakeSlackNotifier:
+    instances = []
+
+    def __init__(self, logger):
+        self.sent_events = []
+        self.summaries = 0
+        FakeSlackNotifier.instances.append(self)
+
+    def send_notification(self, check_result):
+        pass
+
+    def send_events(self, store):
+        events = store.get_events(store.get_cursor('slack'))
+        if events:
+            self.sent_events.extend(events)
+            store.set_cursor('slack', events[-1]['id'])
+
+    def send_summary(self, store, run_id):
+        self.summaries += 1
+
+
+@pytest.fixture
+def env(tmp_path, monkeypatch):
+    with open(os.path.join(REPO_DIR, 'config.yaml')) as f:
+        config = yaml.safe_load(f)
+    config['mxtoolbox']['check_interval'] = 0
+    config['logging']['file'] = str(tmp_path / 'test.log')
+    with open(tmp_path / 'config.yaml', 'w') as f:
+        yaml.safe_dump(config, f)
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('SPARKPOST_API_KEY', 'test-key')
+    monkeypatch.setattr(main, 'setup_logger', lambda: logging.getLogger('test'))
+    load_config.cache_clear()
+
+    state = types.SimpleNamespace(listed={}, fetched=[], config=config)
+    monkeypatch.setattr(SparkPostClient, 'get_sending_ips', lambda self: SENDING_IPS)
+
+    def fetch(self, ip):
+        state.fetched.append(ip)
+        names = state.listed.get(ip, [])
+        return {'ip': ip, 'listed_count': len(names), 'timeout_count': 0,
+                'blacklists': [{'name': name, 'removal_url': f"u#{name}"} for name in names],
+                'check_url': ''}
+
+    monkeypatch.setattr(MXToolboxClient, '_fetch_blacklist', fetch)
+
+    # Notifier modules must only be imported when a channel has work
+    monkeypatch.delitem(sys.modules, 'slack_notifier', raising=False)
+    monkeypatch.delitem(sys.modules, 'email_notifier', raising=False)
+    FakeSlackNotifier.instances = []
+
+    yield state
+    load_config.cache_clear()
+
+
+def use_fake_slack(monkeypatch):
+    monkeypatch.setitem(sys.modules, 'slack_notifier',
+                        types.SimpleNamespace(SlackNotifier=FakeSlackNotifier))
+
+
+def test_pool_filter(env):
+    assert main.check_ips(pools=['b'], notify=False, once=True) == main.EXIT_CLEAN
+    assert env.fetched == ['192.0.2.3']
+
+
+def test_ip_filter(env):
+    assert main.check_ips(ips=['192.0.2.2'], notify=False, once=True) == main.EXIT_CLEAN
+    assert env.fetched == ['192.0.2.2']
+
+
+def test_listed_ip_exit_code(env):
+    env.listed = {'192.0.2.1': ['Spamhaus']}
+    assert main.check_ips(notify=False, once=True) == main.EXIT_LISTED
+    assert env.fetched == ['192.0.2.1', '192.0.2.2', '192.0.2.3']
+
+
+def test_no_matching_ips(env):
+    assert main.check_ips(pools=['missing'], notify=False, once=True) == main.EXIT_NO_IPS
+    assert env.fetched == []
+
+
+def test_sparkpost_failure(env, monkeypatch):
+    def fail(self):
+        raise RuntimeError('SparkPost unavailable')
+
+    monkeypatch.setattr(SparkPostClient, 'get_sending_ips', fail)
+
+    assert main.check_ips(notify=False, once=True) == main.EXIT_ERROR
+    with pytest.raises(SystemExit) as exit_info:
+        main.run_scheduled_check(None)
+    assert exit_info.value.code == main.EXIT_ERROR
+
+
+def test_store_failure_fails_one_shot_only(env, monkeypatch):
+    def fail(self, results):
+        raise RuntimeError('database is locked')
+
+    monkeypatch.setattr(main.BlacklistStore, 'store_results', fail)
+    env.listed = {'192.0.2.1': ['Spamhaus']}
+
+    assert main.check_ips(notify=False, once=True) == main.EXIT_ERROR
+    assert main.check_ips(notify=False) == main.EXIT_LISTED
+    main.run_scheduled_check(None)
+
+
+def test_no_notify_skips_notifier_imports(env):
+    env.listed = {'192.0.2.1': ['Spamhaus']}
+    with pytest.raises(SystemExit) as exit_info:
+        main.main(['run', '--once', '--no-notify'])
+
+    assert exit_info.value.code == main.EXIT_LISTED
+    assert 'slack_notifier' not in sys.modules
+    assert 'email_notifier' not in sys.modules
+
+
+def test_notifier_not_built_without_work(env):
+    assert main.check_ips(once=True) == main.EXIT_CLEAN
+    assert 'slack_notifier' not in sys.modules
+
+
+def test_notifier_built_only_for_pending_changes(env, monkeypatch):
+    use_fake_slack(monkeypatch)
+    env.listed = {'192.0.2.1': ['Spamhaus']}
+
+    assert main.check_ips(once=True) == main.EXIT_LISTED
+    assert len(FakeSlackNotifier.instances) == 1
+    assert [event['type'] for event in FakeSlackNotifier.instances[0].sent_events] == ['listed']
+
+    # Unchanged listing: nothing to send, so Slack is not set up again
+    assert main.check_ips(once=True) == main.EXIT_LISTED
+    assert len(FakeSlackNotifier.instances) == 1
+
+
+def test_notifier_built_for_summary(env, monkeypatch):
+    use_fake_slack(monkeypatch)
+    env.config['notifications']['summary_enabled'] = True
+    with open('config.yaml', 'w') as f:
+        yaml.safe_dump(env.config, f)
+    load_config.cache_clear()
+
+    assert main.check_ips(once=True) == main.EXIT_CLEAN
+    assert FakeSlackNotifier.instances[0].summaries == 1
+
+
+def test_notifier_setup_failure_fails_one_shot(env, monkeypatch):
+    def fail(logger):
+        raise ValueError("SLACK_BOT_TOKEN and SLACK_CHANNEL_ID environment variables must be set")
+
+    monkeypatch.setitem(sys.modules, 'slack_notifier', types.SimpleNamespace(SlackNotifier=fail))
+    env.listed = {'192.0.2.1': ['Spamhaus']}
+
+    assert main.check_ips(once=True) == main.EXIT_ERROR
+
+
+@pytest.mark.parametrize('argv', [
+    ['run', '--pool', 'a'],
+    ['run', '--ip', '192.0.2.1'],
+    ['run', '--no-notify'],
+    ['run', '--bogus'],
+])
+def test_usage_errors(argv):
+    with pytest.raises(SystemExit) as exit_info:
+        main.parse_args(argv)
+    assert exit_info.value.code == 2
+
+
+def test_parse_one_shot_args():
+    args = main.parse_args(['run', '--once', '--pool', 'a', '--pool', 'b', '--ip', '192.0.2.1', '--no-notify'])
+
+    assert args.once
+    assert args.pools == ['a', 'b']
+    assert args.ips == ['192.0.2.1']
+    assert args.no_notify
+
+
+def test_no_command_runs_daemon():
+    assert main.parse_args([]).command is None
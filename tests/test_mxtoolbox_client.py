@@ -0,0 +1,141 @@
+import logging
+import threading
+import time
+
+import pytest
+import requests
+
+import mxtoolbox_client
+from mxtoolbox_client import MXToolboxClient
+
+CONFIG = {'mxtoolbox': {'base_url': 'https://mxtoolbox.com/api/v1', 'check_interval': 0, 'cache_ttl': 300,
+                        'request_timeout': 7}}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(mxtoolbox_client, 'load_config', lambda: CONFIG)
+    return MXToolboxClient(logging.getLogger('test'))
+
+
+def fake_result(ip):
+    return {'ip': ip, 'listed_count': 1, 'timeout_count': 0,
+            'blacklists': [{'name': 'Spamhaus', 'removal_url': 'https://mxtoolbox.com/blacklists.aspx#Spamhaus'}],
+            'check_url': 'https://mxtoolbox.com'}
+
+
+def run_concurrently(target, count):
+    outcomes = []
+    threads = [threading.Thread(target=lambda: outcomes.append(target())) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return outcomes
+
+
+def test_concurrent_checks_share_one_fetch(client, monkeypatch):
+    calls = []
+    release = threading.Event()
+
+    def fetch(ip):
+        calls.append(ip)
+        release.wait(5)
+        return fake_result(ip)
+
+    monkeypatch.setattr(client, '_fetch_blacklist', fetch)
+    threading.Timer(0.2, release.set).start()
+
+    results = run_concurrently(lambda: client.check_ip_blacklist('192.0.2.1'), 8)
+
+    assert calls == ['192.0.2.1']
+    assert len(results) == 8
+    assert all(result['listed_count'] == 1 for result in results)
+    assert client._inflight == {}
+
+
+def test_results_are_independent_copies(client, monkeypatch):
+    monkeypatch.setattr(client, '_fetch_blacklist', fake_result)
+
+    first = client.check_ip_blacklist('192.0.2.1')
+    first['pool'] = 'annotated'
+    first['blacklists'].append({'name': 'Other', 'removal_url': ''})
+    second = client.check_ip_blacklist('192.0.2.1')
+
+    assert 'pool' not in second
+    assert len(second['blacklists']) == 1
+
+
+def test_cache_is_bypassed_with_max_age_zero(client, monkeypatch):
+    calls = []
+    monkeypatch.setattr(client, '_fetch_blacklist', lambda ip: calls.append(ip) or fake_result(ip))
+
+    client.check_ip_blacklist('192.0.2.1')
+    client.check_ip_blacklist('192.0.2.1')
+    assert len(calls) == 1
+
+    client.check_ip_blacklist('192.0.2.1', max_age=0)
+    assert len(calls) == 2
+
+
+def test_leader_failure_reaches_waiters_and_clears_inflight(client, monkeypatch):
+    release = threading.Event()
+
+    def fetch(ip):
+        release.wait(5)
+        raise RuntimeError('upstream failed')
+
+    monkeypatch.setattr(client, '_fetch_blacklist', fetch)
+    threading.Timer(0.2, release.set).start()
+
+    def check():
+        try:
+            return client.check_ip_blacklist('192.0.2.1')
+        except RuntimeError as e:
+            return e
+
+    outcomes = run_concurrently(check, 5)
+
+    assert len(outcomes) == 5
+    assert all(isinstance(outcome, RuntimeError) for outcome in outcomes)
+    assert client._inflight == {}
+    assert '192.0.2.1' not in client._cache
+
+    # A later check starts a new fetch instead of reusing the failure
+    monkeypatch.setattr(client, '_fetch_blacklist', fake_result)
+    assert client.check_ip_blacklist('192.0.2.1')['listed_count'] == 1
+
+
+def test_rate_limit_spaces_upstream_requests(client):
+    client.check_interval = 0.1
+
+    start = time.monotonic()
+    for _ in range(3):
+        client._wait_for_rate_limit()
+
+    assert time.monotonic() - start >= 0.2
+
+
+def test_stalled_request_times_out_for_all_callers(client, monkeypatch):
+    timeouts = []
+    release = threading.Event()
+
+    def get(url, timeout=None):
+        timeouts.append(timeout)
+        release.wait(5)
+        raise requests.exceptions.Timeout('read timed out')
+
+    monkeypatch.setattr(mxtoolbox_client.requests, 'get', get)
+    threading.Timer(0.2, release.set).start()
+
+    def check():
+        try:
+            return client.check_ip_blacklist('192.0.2.1')
+        except requests.exceptions.Timeout as e:
+            return e
+
+    outcomes = run_concurrently(check, 4)
+
+    assert timeouts == [7]
+    assert all(isinstance(outcome, requests.exceptions.Timeout) for outcome in outcomes)
+    assert client._inflight == {}
@@ -0,0 +1,56 @@
+from summary_renderer import SummaryRenderer, chunk_blocks, collapse_ip_ranges
+
+
+def clean_result(ip, pool='default'):
+    return {'ip': ip, 'pool': pool, 'listed_count': 0, 'timeout_count': 0, 'blacklists': []}
+
+
+def test_collapse_ip_ranges_merges_consecutive_addresses():
+    ips = ['10.0.0.3', '10.0.0.1', '10.0.0.2', '10.0.0.5', '10.0.0.255', '10.0.1.0']
+    assert collapse_ip_ranges(ips) == ['10.0.0.1-10.0.0.3', '10.0.0.5', '10.0.0.255-10.0.1.0']
+
+
+def test_collapse_ip_ranges_keeps_versions_apart_and_invalid_last():
+    ips = ['2001:db8::1', '2001:db8::2', '0.0.0.1', 'not-an-ip', '0.0.0.0']
+    assert collapse_ip_ranges(ips) == ['0.0.0.0-0.0.0.1', '2001:db8::1-2001:db8::2', 'not-an-ip']
+
+
+def test_collapse_ip_ranges_empty():
+    assert collapse_ip_ranges([]) == []
+
+
+def test_chunk_blocks_packs_without_splitting_blocks():
+    blocks = ['aaaa\n', 'bbbb\n', 'cccc\n']
+    assert chunk_blocks(blocks, 10) == ['aaaa\nbbbb\n', 'cccc\n']
+
+
+def test_chunk_blocks_splits_oversized_blocks_on_lines():
+    chunks = chunk_blocks(['ab\ncd\n' + 'x' * 7 + '\n'], 5)
+    assert all(len(chunk) <= 5 for chunk in chunks)
+    assert ''.join(chunks) == 'ab\ncd\n' + 'x' * 7 + '\n'
+
+
+def test_chunk_blocks_empty():
+    assert chunk_blocks([], 10) == []
+
+
+def test_clean_range_cap_applies_to_slack_only():
+    # Every other address, so each IP is its own range
+    results = [clean_result(f"10.0.0.{i}") for i in range(0, 100, 2)]
+
+    slack = ''.join(SummaryRenderer('slack', 100000).render(results, set(), None))
+    email = ''.join(SummaryRenderer('email', 100000).render(results, set(), None))
+
+    assert 'and 30 more ranges' in slack
+    assert 'more ranges' not in email
+    assert '10.0.0.98' in email
+
+
+def test_render_tags_new_listings():
+    listed = {'ip': '10.0.0.1', 'pool': 'default', 'listed_count': 2, 'timeout_count': 0,
+              'blacklists': [{'name': 'A', 'removal_url': 'u#A'}, {'name': 'B', 'removal_url': 'u#B'}]}
+    renderer = SummaryRenderer('email', 100000)
+
+    assert '[NEW IP]' in ''.join(renderer.render([listed], {('10.0.0.1', 'A'), ('10.0.0.1', 'B')}, None))
+    assert '[NEW] ' in ''.join(renderer.render([listed], {('10.0.0.1', 'A')}, None))
+    assert '[NEW' not in ''.join(renderer.render([listed], set(), None))
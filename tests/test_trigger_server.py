@@ -0,0 +1,93 @@
+import json
+import logging
+import urllib.error
+import urllib.request
+
+import pytest
+
+import trigger_server
+from trigger_server import TriggerServer
+
+SENDING_IPS = [
+    {'ip': '192.0.2.1', 'pool': 'shared', 'hostname': 'mta1.example.com'},
+    {'ip': '192.0.2.2', 'pool': 'shared', 'hostname': 'mta2.example.com'},
+]
+
+
+class FakeSparkPost:
+    def get_sending_ips(self):
+        return SENDING_IPS
+
+
+class FakeMXToolbox:
+    def __init__(self):
+        self.checked = []
+        self.error = None
+
+    def check_ip_blacklist(self, ip, max_age=None):
+        self.checked.append((ip, max_age))
+        if self.error:
+            raise self.error
+        return {'ip': ip, 'listed_count': 0, 'timeout_count': 0, 'blacklists': [], 'check_url': ''}
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr(trigger_server, 'load_config',
+                        lambda: {'trigger': {'enabled': True, 'host': '127.0.0.1', 'port': 0}})
+    trigger = TriggerServer(logging.getLogger('test'), FakeMXToolbox(), FakeSparkPost())
+    trigger.start()
+    yield trigger
+    trigger.httpd.shutdown()
+    trigger.httpd.server_close()
+
+
+def get(trigger, query):
+    url = f"http://127.0.0.1:{trigger.httpd.server_address[1]}/check{query}"
+    try:
+        with urllib.request.urlopen(url) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_check_sending_ip(server):
+    status, body = get(server, '?ip=192.0.2.1')
+
+    assert status == 200
+    assert body['results'][0]['pool'] == 'shared'
+    assert server.mxtoolbox.checked == [('192.0.2.1', None)]
+
+
+def test_check_pool_fresh(server):
+    status, body = get(server, '?pool=shared&fresh=1')
+
+    assert status == 200
+    assert [result['ip'] for result in body['results']] == ['192.0.2.1', '192.0.2.2']
+    assert all(max_age == 0 for _, max_age in server.mxtoolbox.checked)
+
+
+@pytest.mark.parametrize('query', ['', '?ip=192.0.2.1&pool=shared', '?ip=not-an-ip'])
+def test_bad_requests(server, query):
+    status, body = get(server, query)
+
+    assert status == 400
+    assert 'error' in body
+    assert server.mxtoolbox.checked == []
+
+
+@pytest.mark.parametrize('query', ['?ip=198.51.100.7', '?pool=missing'])
+def test_unknown_ip_or_pool_is_not_checked(server, query):
+    status, _ = get(server, query)
+
+    assert status == 404
+    assert server.mxtoolbox.checked == []
+
+
+def test_upstream_failure(server):
+    server.mxtoolbox.error = RuntimeError('upstream failed')
+
+    status, body = get(server, '?ip=192.0.2.1')
+
+    assert status == 502
+    assert body['error'] == 'upstream failed'
@@ -0,0 +1,120 @@
+import ipaddress
+import json
+import threading
+from config import load_config
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List, Optional
+from urllib.parse import urlparse, parse_qs
+
+class TriggerServer:
+    """
+    Local HTTP endpoint for on-demand blacklist checks on the running daemon
+
+    GET /check?ip=<ip>      check a single IP
+    GET /check?pool=<pool>  check every sending IP in a pool
+
+    Add fresh=1 to bypass cached results. Checks go through the daemon's
+    MXToolboxClient, so they share its rate limiter and cache and attach to
+    any in-flight check of the same IP.
+    """
+
+    def __init__(self, logger, mxtoolbox, sparkpost):
+        config = load_config()
+
+        trigger_config = config.get('trigger', {})
+        self.enabled = trigger_config.get('enabled', False)
+        self.host = trigger_config.get('host', '127.0.0.1')
+        self.port = trigger_config.get('port', 8080)
+
+        self.logger = logger
+        self.mxtoolbox = mxtoolbox
+        self.sparkpost = sparkpost
+        self.httpd: Optional[ThreadingHTTPServer] = None
+
+    def start(self) -> None:
+        """Start serving requests on a background thread"""
+        if not self.enabled:
+            return
+
+        try:
+            self.httpd = ThreadingHTTPServer((self.host, self.port), _TriggerRequestHandler)
+        except OSError as e:
+            self.logger.error(f"Failed to start on-demand check endpoint on {self.host}:{self.port}: {str(e)}")
+            return
+
+        self.httpd.daemon_threads = True
+        self.httpd.trigger = self
+
+        thread = threading.Thread(target=self.httpd.serve_forever, name='trigger-server', daemon=True)
+        thread.start()
+        self.logger.info(f"On-demand check endpoint listening on http://{self.host}:{self.port}/check")
+
+    def check_ip(self, ip: str, fresh: bool = False) -> Optional[Dict[str, Any]]:
+        """Check a single sending IP, or return None if it is not one of ours"""
+        ip_info = next((info for info in self.sparkpost.get_sending_ips() if info['ip'] == ip), None)
+        if ip_info is None:
+            return None
+        return self._check(ip, ip_info, fresh)
+
+    def check_pool(self, pool: str, fresh: bool = False) -> List[Dict[str, Any]]:
+        """Check every sending IP in a pool"""
+        ip_infos = [info for info in self.sparkpost.get_sending_ips() if info['pool'] == pool]
+        return [self._check(info['ip'], info, fresh) for info in ip_infos]
+
+    def _check(self, ip: str, ip_info: Dict[str, Any], fresh: bool) -> Dict[str, Any]:
+        self.logger.info(f"On-demand check requested for IP {ip}")
+        check_result = self.mxtoolbox.check_ip_blacklist(ip, max_age=0 if fresh else None)
+        check_result['pool'] = ip_info.get('pool', 'default')
+        check_result['hostname'] = ip_info.get('hostname', 'N/A')
+        return check_result
+
+
+class _TriggerRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        trigger = self.server.trigger
+        url = urlparse(self.path)
+        if url.path != '/check':
+            self._send_json(404, {'error': 'Not found'})
+            return
+
+        params = parse_qs(url.query)
+        ip = params.get('ip', [None])[0]
+        pool = params.get('pool', [None])[0]
+        fresh = params.get('fresh', ['0'])[0].lower() in ('1', 'true', 'yes')
+
+        if bool(ip) == bool(pool):
+            self._send_json(400, {'error': "Specify exactly one of 'ip' or 'pool'"})
+            return
+
+        try:
+            if ip:
+                try:
+                    ipaddress.ip_address(ip)
+                except ValueError:
+                    self._send_json(400, {'error': f"Invalid IP address: {ip}"})
+                    return
+                result = trigger.check_ip(ip, fresh)
+                if result is None:
+                    self._send_json(404, {'error': f"Not a sending IP: {ip}"})
+                    return
+                self._send_json(200, {'results': [result]})
+            else:
+                results = trigger.check_pool(pool, fresh)
+                if not results:
+                    self._send_json(404, {'error': f"No sending IPs found in pool: {pool}"})
+                    return
+                self._send_json(200, {'results': results})
+        except Exception as e:
+            trigger.logger.error(f"On-demand check failed: {str(e)}")
+            self._send_json(502, {'error': str(e)})
+
+    def _send_json(self, status: int, body: Dict[str, Any]) -> None:
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format: str, *args) -> None:
+        self.server.trigger.logger.info(f"Trigger request: {format % args}")